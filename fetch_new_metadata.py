@@ -1,10 +1,17 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util.retry import Retry
 import xml.etree.ElementTree as ET
+import io
 import time
 import json
+import hashlib
 import os
 import subprocess
 import sys
+import concurrent.futures
+import threading
 from datetime import datetime
 
 # =============================================================================
@@ -17,6 +24,7 @@ PASSWORD = "Ussu8229"
 
 # File Paths
 SEQUENCE_FILE = "last_sequence.json"
+STATIONS_CACHE_FILE = "stations_cache.json"  # station IDs keyed by a hash of the station list response
 CREATIVES_FOLDER = "creatives_metadata"
 MASTER_CREATIVE_IDS_FILE = "master_creative_ids.json"
 
@@ -25,7 +33,10 @@ BASELINE_START_DATE = "10/23/2025 00:00:00"
 BASELINE_END_DATE = "10/23/2025 23:59:59"
 
 # API Settings
-RATE_LIMIT_DELAY = 1  # seconds between API calls
+RATE_LIMIT_DELAY = 1  # seconds between API calls, once the server has rate limited us
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds per API call
+MAX_RETRIES = 3  # retries for connection errors and 429/5xx responses
+STATION_WORKERS = 8  # station snapshots in flight at once
 
 # Test Mode Configuration
 TEST_MODE = False  # Set to True to test with first station only, False for production
@@ -40,24 +51,172 @@ SAVE_DETAILED_RECORDS = True  # Set to False to only save creative summaries
 # END CONFIGURATION SECTION
 # =============================================================================
 
+# Snapshot sequence elements (local names) and the keys they are returned under
+SEQUENCE_TAGS = {
+    'BiggestSequenceForAirPlayChange': 'airplay',
+    'BiggestSequenceForTitleAssignmentChange': 'title',
+    'BiggestSequenceForMetaTitleIDChange': 'meta_title'
+}
+
+# Namespace-qualified tag -> local name, filled in as new tags are seen
+LOCAL_TAG_NAMES = {}
+
+def local_tag_name(tag):
+    """
+    Return an element tag without its namespace, stripping each distinct tag only once
+    Names are interned so record keys share one string and compare by identity
+    """
+    try:
+        return LOCAL_TAG_NAMES[tag]
+    except KeyError:
+        name = LOCAL_TAG_NAMES[tag] = sys.intern(tag[tag.rfind('}') + 1:])
+        return name
+
+# Table3 fields the tracker reads (creative fields first, then change fields), and where each one goes
+RECORD_FIELDS = ('CreativeID', 'aircheck_id', 'Account_x002F_Title', 'start_time', 'end_time', 'action', 'sequence_id')
+RECORD_FIELD_POSITIONS = {name: i for i, name in enumerate(RECORD_FIELDS)}
+
+# Namespace-qualified tag -> position in RECORD_FIELDS, or -1 for other fields
+RECORD_FIELD_SLOTS = {}
+
+def extract_record_fields(record_elem):
+    """Read only the fields of a Table3 record the tracker uses, in RECORD_FIELDS order"""
+    values = [None] * len(RECORD_FIELDS)
+    for child in record_elem:
+        slot = RECORD_FIELD_SLOTS.get(child.tag)
+        if slot is None:
+            slot = RECORD_FIELD_SLOTS[child.tag] = RECORD_FIELD_POSITIONS.get(local_tag_name(child.tag), -1)
+        if slot >= 0:
+            values[slot] = child.text
+    return values
+
 class MediaMonitorsTracker:
     def __init__(self, username=USERNAME, password=PASSWORD):
         self.username = username
         self.password = password
         self.sequence_file = SEQUENCE_FILE
+        self.stations_cache_file = STATIONS_CACHE_FILE
+        self.station_ids = None  # Station list fetched once per run
         self.creatives_folder = CREATIVES_FOLDER
         self.master_ids_file = os.path.join(CREATIVES_FOLDER, MASTER_CREATIVE_IDS_FILE)
+        self.master_ids = None  # Master creative IDs, read from disk once per run
         self.test_mode = TEST_MODE
+        self.rate_limited = False  # Set once the server answers 429; requests are spaced out from then on
+        self.pacing_lock = threading.Lock()
+        self.next_request_time = 0.0  # Earliest start (time.monotonic) for the next paced request
+        self.session = self.create_session()
         
         # Ensure creatives folder exists
         self.ensure_creatives_folder()
+    
+    def create_session(self):
+        """Create an HTTP session that keeps connections alive and retries transient errors"""
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        
+        # Every endpoint takes the credentials, so send them by default
+        session.params = {
+            'username': self.username,
+            'password': self.password
+        }
+        return session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+
+    def iter_xml_response(self, url, params, record_tag='Table3'):
+        """
+        Request an API URL and parse the XML while it downloads,
+        yielding each element as its end tag arrives
+        Once the caller has read a record_tag element, it is detached from
+        its parent, so memory stays flat however many records arrive
+        """
+        self.wait_for_request_slot()
         
+        try:
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT, stream=True)
+        except requests.exceptions.RetryError:
+            # Retries ran out on 429/5xx responses
+            self.rate_limited = True
+            raise
+        
+        with response:
+            self.check_rate_limiting(response)
+            response.raise_for_status()
+            response.raw.decode_content = True  # Let urllib3 undo gzip/deflate
+            
+            try:
+                open_elements = []  # Ancestors of the element being parsed
+                for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                    if event == 'start':
+                        open_elements.append(elem)
+                        continue
+                    
+                    open_elements.pop()
+                    yield elem
+                    
+                    # iterparse reads ahead, so later siblings may already be
+                    # attached; remove this record itself, not the last child
+                    if open_elements and local_tag_name(elem.tag) == record_tag:
+                        open_elements[-1].remove(elem)
+            except Urllib3Error as e:
+                # Read errors mid-stream come from urllib3, not requests
+                raise requests.ConnectionError(e)
+        
+    def wait_for_request_slot(self):
+        """
+        Once the server has rate limited us, space request starts at least
+        RATE_LIMIT_DELAY apart across all worker threads; until then, don't wait
+        """
+        if not self.rate_limited:
+            return
+        
+        with self.pacing_lock:
+            now = time.monotonic()
+            start_time = max(now, self.next_request_time)
+            self.next_request_time = start_time + RATE_LIMIT_DELAY
+        
+        if start_time > now:
+            time.sleep(start_time - now)
+
+    def check_rate_limiting(self, response):
+        """Note whether the server answered 429 on the way to this response"""
+        retries = getattr(response.raw, 'retries', None)
+        if response.status_code == 429 or (retries and any(attempt.status == 429 for attempt in retries.history)):
+            self.rate_limited = True
+
     def ensure_creatives_folder(self):
         """Create creatives metadata folder if it doesn't exist"""
         if not os.path.exists(self.creatives_folder):
             os.makedirs(self.creatives_folder)
             print(f"Created directory: {self.creatives_folder}")
 
+    def write_file_atomic(self, path, text):
+        """
+        Write text to a temp file and swap it into place, so a crash
+        mid-write never leaves a truncated file behind
+        """
+        temp_path = f"{path}.tmp.{os.getpid()}"  # Per process, so concurrent runs don't share a temp file
+        with open(temp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
     def generate_filename(self, start_date, end_date):
         """Generate filename based on date range"""
         def parse_date_string(date_str):
@@ -96,15 +255,21 @@ class MediaMonitorsTracker:
             'creative_ids': sorted(list(creative_ids_set))
         }
         
-        with open(self.master_ids_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Same layout as create_master.py and scripts/1-fetch_metadata.py, which share this file
+        self.write_file_atomic(self.master_ids_file, json.dumps(data, indent=2))
         
         print(f"Updated master creative IDs file with {len(creative_ids_set)} total IDs")
 
+    def get_master_creative_ids(self):
+        """Return the master creative IDs, loading the file on first use only"""
+        if self.master_ids is None:
+            self.master_ids = self.load_master_creative_ids()
+        return self.master_ids
+
     def filter_new_creatives(self, creatives):
         """Filter out creatives that already exist in master list"""
         # Load existing creative IDs
-        existing_ids = self.load_master_creative_ids()
+        existing_ids = self.get_master_creative_ids()
         
         # Filter out existing creatives
         new_creatives = []
@@ -119,142 +284,150 @@ class MediaMonitorsTracker:
     def update_master_with_new_creatives(self, new_creatives):
         """Update master list with new creative IDs"""
         # Load existing IDs
-        existing_ids = self.load_master_creative_ids()
+        existing_ids = self.get_master_creative_ids()
         
         # Add new IDs
         new_ids = {creative['creative_id'] for creative in new_creatives}
-        updated_ids = existing_ids.union(new_ids)
+        updated_ids = existing_ids | new_ids
         
-        # Save updated list
-        self.save_master_creative_ids(updated_ids)
+        # Save updated list, only when something was actually added
+        if len(updated_ids) > len(existing_ids):
+            self.save_master_creative_ids(updated_ids)
+        self.master_ids = updated_ids
         
         return len(new_ids)
 
     def get_licensed_stations(self):
         """Get all licensed stations from the API"""
         url = "https://data.mediamonitors.com/mmwebservices/service1.asmx/GetLicensedStations"
-        params = {
-            'username': self.username,
-            'password': self.password
-        }
-        
         try:
-            response = requests.get(url, params=params)
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
-            return response.text
+            return response.content
         except requests.RequestException as e:
             print(f"Error fetching stations: {e}")
             return None
 
     def get_airplay_snapshot(self, station_id, start_time, end_time):
-        """Get airplay snapshot for a station - returns count, sequences, and creative data"""
+        """
+        Get airplay snapshot for a station - returns count, sequences, and creative data
+        The count is None if the snapshot could not be fetched or parsed
+        """
         url = "https://data.mediamonitors.com/mmwebservices/service1.asmx/GetAirPlaySnapshotString"
         params = {
             'stationID': station_id,
-            'username': self.username,
-            'password': self.password,
             'startTimeStr': start_time,
             'endTimeStr': end_time
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.text)
-            
-            # Count Table3 elements and extract creative data
+            # Count Table3 elements, extract creative data and sequence numbers
+            # in one pass while the response streams in
             table3_count = 0
-            creatives = {}  # Use dict for deduplication by creative_id
+            creatives = {}  # creative_id -> (aircheck_id, name, start, end), deduplicated by creative_id
+            sequences = {}  # Kept for future use
             
-            for elem in root.iter():
-                if elem.tag.endswith('Table3'):
+            for elem in self.iter_xml_response(url, params):
+                tag = local_tag_name(elem.tag)
+                
+                if tag == 'Table3':
                     table3_count += 1
                     
-                    # Extract creative information
-                    creative_data = {}
-                    for child in elem:
-                        tag_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                        creative_data[tag_name] = child.text
+                    # Extract creative information, skipping the record's other fields
+                    creative_id, aircheck_id, creative_name, start_time_val, end_time_val, _, _ = extract_record_fields(elem)
                     
                     # Add to creatives dict if we have the key fields (deduplicates automatically by creative_id)
-                    creative_id = creative_data.get('CreativeID')
-                    aircheck_id = creative_data.get('aircheck_id')
-                    creative_name = creative_data.get('Account_x002F_Title')
-                    start_time_val = creative_data.get('start_time')
-                    end_time_val = creative_data.get('end_time')
                     
                     if creative_id and creative_name:
-                        creatives[creative_id] = {
-                            'creative_id': creative_id,
-                            'aircheck_id': aircheck_id,
-                            'creative_name': creative_name,
-                            'station_id': station_id,
-                            'start_time': start_time_val,
-                            'end_time': end_time_val
-                        }
-            
-            # Get sequence numbers (kept for future use)
-            sequences = {}
-            for elem in root.iter():
-                if elem.tag.endswith('BiggestSequenceForAirPlayChange'):
-                    sequences['airplay'] = int(elem.text)
-                elif elem.tag.endswith('BiggestSequenceForTitleAssignmentChange'):
-                    sequences['title'] = int(elem.text)
-                elif elem.tag.endswith('BiggestSequenceForMetaTitleIDChange'):
-                    sequences['meta_title'] = int(elem.text)
+                        creatives[creative_id] = (aircheck_id, creative_name, start_time_val, end_time_val)
+                
+                elif tag in SEQUENCE_TAGS:
+                    sequences[SEQUENCE_TAGS[tag]] = int(elem.text)
+                    elem.clear()
             
-            # Convert dict values back to list
-            creatives_list = list(creatives.values())
+            # Build the creative dicts once per unique creative, not once per airing
+            creatives_list = [
+                {
+                    'creative_id': creative_id,
+                    'aircheck_id': aircheck_id,
+                    'creative_name': creative_name,
+                    'station_id': station_id,
+                    'start_time': start_time_val,
+                    'end_time': end_time_val
+                }
+                for creative_id, (aircheck_id, creative_name, start_time_val, end_time_val) in creatives.items()
+            ]
             
             return table3_count, sequences, creatives_list
             
         except requests.RequestException as e:
             print(f"Error fetching snapshot for station {station_id}: {e}")
-            return 0, {}, []
+            return None, {}, []
         except ET.ParseError as e:
             print(f"Error parsing XML for station {station_id}: {e}")
-            return 0, {}, []
+            return None, {}, []
 
     def parse_stations_xml(self, stations_xml):
-        """Parse stations XML and return list of station objects"""
+        """Parse stations XML and return the list of station IDs, one per station record"""
         try:
-            root = ET.fromstring(stations_xml)
-            stations = []
-            for elem in root.iter():
-                station_id_child = None
-                for child in elem:
-                    if child.tag.endswith('StationID'):
-                        station_id_child = child
-                        break
-                if station_id_child is not None:
-                    stations.append(elem)
-            return stations
+            station_ids = []
+            for event, elem in ET.iterparse(io.BytesIO(stations_xml), events=('end',)):
+                if local_tag_name(elem.tag) == 'StationID':
+                    station_ids.append(elem.text)
+            return station_ids
         except ET.ParseError as e:
             print(f"Error parsing stations XML: {e}")
             return []
 
-    def extract_station_info(self, station_elem):
-        """Extract station ID from station element"""
-        station_id = None
-        for child in station_elem:
-            if child.tag.endswith('StationID'):
-                station_id = child.text
-                break
-        return station_id
+    def get_station_ids(self):
+        """
+        Get the station ID list, fetched once per run
+        The XML is only parsed when the response differs from the cached one
+        Returns None if the stations could not be fetched
+        """
+        if self.station_ids is not None:
+            return self.station_ids
+        
+        stations_xml = self.get_licensed_stations()
+        if not stations_xml:
+            return None
+        
+        response_hash = hashlib.sha256(stations_xml).hexdigest()
+        
+        # Reuse the parsed list if the station list hasn't changed
+        if os.path.exists(self.stations_cache_file):
+            try:
+                with open(self.stations_cache_file, 'r') as f:
+                    cache = json.load(f)
+                if cache.get('hash') == response_hash:
+                    self.station_ids = cache['station_ids']
+                    return self.station_ids
+            except (OSError, json.JSONDecodeError, KeyError, AttributeError) as e:
+                print(f"Warning: Error reading stations cache file: {e}")
+        
+        # Parse stations
+        self.station_ids = self.parse_stations_xml(stations_xml)
+        
+        if self.station_ids:
+            cache = {'hash': response_hash, 'station_ids': self.station_ids}
+            try:
+                self.write_file_atomic(self.stations_cache_file, json.dumps(cache, indent=2))
+            except OSError as e:
+                # The cache only saves a parse next run; carry on without it
+                print(f"Warning: Could not write stations cache file: {e}")
+        
+        return self.station_ids
 
     def get_airplay_data(self, start_date=BASELINE_START_DATE, end_date=BASELINE_END_DATE):
         """Get airplay data for configured date range"""
         print(f"Getting airplay data for date range: {start_date} to {end_date}")
         
         # Get all stations
-        stations_xml = self.get_licensed_stations()
-        if not stations_xml:
+        stations = self.get_station_ids()
+        if stations is None:
             print("Failed to get stations")
             return []
         
-        # Parse stations
-        stations = self.parse_stations_xml(stations_xml)
         if not stations:
             print("No stations found")
             return []
@@ -269,17 +442,41 @@ class MediaMonitorsTracker:
         all_creatives = {}  # Use dict for global deduplication by creative_id
         total_records = 0
         processed_stations = 0
+        failed_stations = []
         
-        for i, station_elem in enumerate(stations_to_process):
-            station_id = self.extract_station_info(station_elem)
-            if not station_id:
-                print(f"Skipping station {i+1}: No station ID found")
-                continue
+        # Snapshots run in parallel so a slow station doesn't hold up the next;
+        # requests are paced in the workers once the server rate limits us
+        # (see wait_for_request_slot); results are merged in station order on this thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=STATION_WORKERS) as executor:
+            futures = {}
             
-            print(f"Processing station {i+1}/{len(stations_to_process)}: {station_id}")
+            for i, station_id in enumerate(stations_to_process):
+                if not station_id:
+                    print(f"Skipping station {i+1}: No station ID found")
+                    continue
+                
+                print(f"Requesting station {i+1}/{len(stations_to_process)}: {station_id}")
+                
+                # Get airplay snapshot for this station
+                future = executor.submit(self.get_airplay_snapshot, station_id, start_date, end_date)
+                futures[future] = station_id
             
-            # Get airplay snapshot for this station
-            count, sequences, creatives = self.get_airplay_snapshot(station_id, start_date, end_date)
+            results = [(station_id, future.result()) for future, station_id in futures.items()]
+        
+        # Give failed stations one more, paced, attempt so they don't silently drop out
+        retry_ids = [station_id for station_id, (count, _, _) in results if count is None]
+        if retry_ids:
+            print(f"\n⚠ Retrying {len(retry_ids)} failed stations one at a time...")
+            self.rate_limited = True
+            retried = {station_id: self.get_airplay_snapshot(station_id, start_date, end_date)
+                       for station_id in retry_ids}
+            results = [(station_id, retried.get(station_id, result)) for station_id, result in results]
+        
+        for station_id, (count, sequences, creatives) in results:
+            if count is None:
+                print(f"  ✗ Station {station_id}: failed")
+                failed_stations.append(station_id)
+                continue
             
             print(f"  Station {station_id}: {count} records, {len(creatives)} unique creatives")
             
@@ -290,16 +487,14 @@ class MediaMonitorsTracker:
             
             total_records += count
             processed_stations += 1
-            
-            # Rate limiting between stations (except for last station)
-            if i < len(stations_to_process) - 1:
-                time.sleep(RATE_LIMIT_DELAY)
         
         # Convert dict values back to list
         all_creatives_list = list(all_creatives.values())
         
         print(f"\n=== SUMMARY ===")
         print(f"Processed stations: {processed_stations}")
+        if failed_stations:
+            print(f"Failed stations: {len(failed_stations)} ({', '.join(failed_stations)})")
         print(f"Total airplay records: {total_records}")
         print(f"Unique creatives found: {len(all_creatives_list)}")
         
@@ -324,8 +519,8 @@ class MediaMonitorsTracker:
             'creatives': creatives
         }
         
-        with open(filename, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        # No indent: lets json use its C encoder, and one write instead of one per token
+        self.write_file_atomic(filename, json.dumps(output_data))
         
         return filename
 
@@ -375,8 +570,7 @@ class MediaMonitorsTracker:
     
     def save_sequence(self, sequence_data):
         """Save sequence data to file (for future use)"""
-        with open(self.sequence_file, 'w') as f:
-            json.dump(sequence_data, f, indent=2)
+        self.write_file_atomic(self.sequence_file, json.dumps(sequence_data, indent=2))
 
     def load_sequence(self):
         """Load sequence data from file (for future use)"""
@@ -390,20 +584,17 @@ class MediaMonitorsTracker:
         print("Establishing baseline for future sequence tracking...")
         
         # Get all stations
-        stations_xml = self.get_licensed_stations()
-        if not stations_xml:
+        stations = self.get_station_ids()
+        if stations is None:
             print("Failed to get stations")
             return False
         
-        # Parse stations
-        stations = self.parse_stations_xml(stations_xml)
         if not stations:
             print("No stations found")
             return False
         
         # Get baseline from first station to capture initial sequence
-        first_station = stations[0]
-        station_id = self.extract_station_info(first_station)
+        station_id = stations[0]
         
         if station_id:
             print(f"Getting baseline from station {station_id}")
@@ -424,123 +615,124 @@ class MediaMonitorsTracker:
         return False
 
     def get_airplay_changes(self, last_sequence):
-        """Get airplay changes since last sequence (for future use)"""
+        """
+        Get airplay changes since last sequence (for future use)
+        Returns the number of change records, highest sequence, new creatives
+        and the number of additions
+        """
         url = "https://data.mediamonitors.com/mmwebservices/service1.asmx/GetAirPlayChangesAfterSequenceString"
         params = {
-            'username': self.username,
-            'password': self.password,
             'sequenceID': last_sequence
         }
         
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
+            record_count = 0
+            additions = 0  # Records with action == 'true'
+            creatives = {}  # creative_id -> (aircheck_id, name, start, end), deduplicated by creative_id
+            # Sequence IDs are compared as digit strings (longer is larger, equal
+            # lengths compare lexically) and converted to int once at the end
+            highest_sequence_str = str(last_sequence)
             
-            root = ET.fromstring(response.text)
-            
-            records = []
-            creatives = {}  # Use dict for deduplication by creative_id
-            highest_sequence = last_sequence
-            
-            for elem in root.iter():
-                if elem.tag.endswith('Table3'):
-                    # Parse airplay record
-                    record = {}
-                    for child in elem:
-                        tag_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                        record[tag_name] = child.text
+            # Parse while the response streams in, reading each record as it completes
+            for elem in self.iter_xml_response(url, params):
+                if local_tag_name(elem.tag) == 'Table3':
+                    # Parse only the fields we use from the airplay record
+                    empty_record = len(elem) == 0
+                    creative_id, aircheck_id, creative_name, start_time_val, end_time_val, action, seq_str = extract_record_fields(elem)
                     
-                    if record:
-                        records.append(record)
+                    if not empty_record:
+                        record_count += 1
                         
                         # Extract creative data for new additions only
-                        if record.get('action') == 'true':
-                            creative_id = record.get('CreativeID')
-                            aircheck_id = record.get('aircheck_id')
-                            creative_name = record.get('Account_x002F_Title')
-                            start_time_val = record.get('start_time')
-                            end_time_val = record.get('end_time')
+                        if action == 'true':
+                            additions += 1
                             
                             if creative_id and creative_name:
-                                creatives[creative_id] = {
-                                    'creative_id': creative_id,
-                                    'aircheck_id': aircheck_id,
-                                    'creative_name': creative_name,
-                                    'station_id': None,  # Not available in changes API
-                                    'start_time': start_time_val,
-                                    'end_time': end_time_val
-                                }
+                                creatives[creative_id] = (aircheck_id, creative_name, start_time_val, end_time_val)
                         
                         # Track highest sequence
-                        if 'sequence_id' in record:
-                            seq_id = int(record['sequence_id'])
-                            highest_sequence = max(highest_sequence, seq_id)
+                        if seq_str and (len(seq_str) > len(highest_sequence_str) or
+                                        (len(seq_str) == len(highest_sequence_str) and seq_str > highest_sequence_str)):
+                            highest_sequence_str = seq_str
             
-            # Convert dict values back to list
-            creatives_list = list(creatives.values())
+            highest_sequence = int(highest_sequence_str)
             
-            return records, highest_sequence, creatives_list
+            # Build the creative dicts once per unique creative, not once per change
+            creatives_list = [
+                {
+                    'creative_id': creative_id,
+                    'aircheck_id': aircheck_id,
+                    'creative_name': creative_name,
+                    'station_id': None,  # Not available in changes API
+                    'start_time': start_time_val,
+                    'end_time': end_time_val
+                }
+                for creative_id, (aircheck_id, creative_name, start_time_val, end_time_val) in creatives.items()
+            ]
+            
+            return record_count, highest_sequence, creatives_list, additions
             
         except requests.RequestException as e:
             print(f"Error fetching airplay changes: {e}")
-            return [], last_sequence, []
+            return 0, last_sequence, [], 0
         except ET.ParseError as e:
             print(f"Error parsing XML: {e}")
-            return [], last_sequence, []
+            return 0, last_sequence, [], 0
 
 def main():
-    tracker = MediaMonitorsTracker()
-    
-    print("Media Monitors Airplay Tracker - Enhanced with Deduplication")
-    print("=" * 60)
-    print(f"Mode: {'TEST' if TEST_MODE else 'PRODUCTION'}")
-    print(f"Username: {USERNAME}")
-    print(f"Date Range: {BASELINE_START_DATE} to {BASELINE_END_DATE}")
-    print(f"Rate Limit Delay: {RATE_LIMIT_DELAY}s")
-    print(f"Creatives Folder: {CREATIVES_FOLDER}")
-    print(f"Next Script: {NEXT_SCRIPT}")
-    print("=" * 60)
-    
-    # Get airplay data for the configured date range
-    all_creatives = tracker.get_airplay_data()
-    
-    if all_creatives:
-        # Filter out creatives that already exist
-        new_creatives = tracker.filter_new_creatives(all_creatives)
-        
-        if new_creatives:
-            # Save new creatives to JSON file
-            filename = tracker.save_creatives(new_creatives, BASELINE_START_DATE, BASELINE_END_DATE)
-            print(f"\nNew creatives saved to: {filename}")
-            
-            # Update master creative IDs list
-            added_count = tracker.update_master_with_new_creatives(new_creatives)
-            print(f"Added {added_count} new creative IDs to master list")
-            
-            # Show sample of new creative data for verification
-            print(f"\nSample of {len(new_creatives)} new creatives:")
-            for i, creative in enumerate(new_creatives[:3]):
-                print(f"  {i+1}. Creative ID: {creative['creative_id']}")
-                print(f"      Aircheck ID: {creative['aircheck_id']}")
-                print(f"      Station: {creative['station_id']}")
-                print(f"      Name: {creative['creative_name']}")
-                print(f"      Start: {creative['start_time']}")
-                print(f"      End: {creative['end_time']}")
-            
-            if len(new_creatives) > 3:
-                print(f"... and {len(new_creatives) - 3} more")
+    with MediaMonitorsTracker() as tracker:
+        print("Media Monitors Airplay Tracker - Enhanced with Deduplication")
+        print("=" * 60)
+        print(f"Mode: {'TEST' if TEST_MODE else 'PRODUCTION'}")
+        print(f"Username: {USERNAME}")
+        print(f"Date Range: {BASELINE_START_DATE} to {BASELINE_END_DATE}")
+        print(f"Rate Limit Delay: {RATE_LIMIT_DELAY}s (once the server rate limits us)")
+        print(f"Creatives Folder: {CREATIVES_FOLDER}")
+        print(f"Next Script: {NEXT_SCRIPT}")
+        print("=" * 60)
+        
+        # Get airplay data for the configured date range
+        all_creatives = tracker.get_airplay_data()
+        
+        if all_creatives:
+            # Filter out creatives that already exist
+            new_creatives = tracker.filter_new_creatives(all_creatives)
             
-            # Trigger next script
-            success = tracker.run_next_script()
-            if success:
-                print(f"\n✓ Pipeline completed successfully!")
+            if new_creatives:
+                # Save new creatives to JSON file
+                filename = tracker.save_creatives(new_creatives, BASELINE_START_DATE, BASELINE_END_DATE)
+                print(f"\nNew creatives saved to: {filename}")
+                
+                # Update master creative IDs list
+                added_count = tracker.update_master_with_new_creatives(new_creatives)
+                print(f"Added {added_count} new creative IDs to master list")
+                
+                # Show sample of new creative data for verification
+                print(f"\nSample of {len(new_creatives)} new creatives:")
+                sample_lines = []
+                for i, creative in enumerate(new_creatives[:3]):
+                    sample_lines.append(f"  {i+1}. Creative ID: {creative['creative_id']}")
+                    sample_lines.append(f"      Aircheck ID: {creative['aircheck_id']}")
+                    sample_lines.append(f"      Station: {creative['station_id']}")
+                    sample_lines.append(f"      Name: {creative['creative_name']}")
+                    sample_lines.append(f"      Start: {creative['start_time']}")
+                    sample_lines.append(f"      End: {creative['end_time']}")
+                print("\n".join(sample_lines))
+                
+                if len(new_creatives) > 3:
+                    print(f"... and {len(new_creatives) - 3} more")
+                
+                # Trigger next script
+                success = tracker.run_next_script()
+                if success:
+                    print(f"\n✓ Pipeline completed successfully!")
+                else:
+                    print(f"\n✗ Pipeline completed with errors in next script")
             else:
-                print(f"\n✗ Pipeline completed with errors in next script")
+                print(f"\nNo new creatives found - all {len(all_creatives)} creatives already exist in master list")
+                print("Skipping file save and next script execution")
         else:
-            print(f"\nNo new creatives found - all {len(all_creatives)} creatives already exist in master list")
-            print("Skipping file save and next script execution")
-    else:
-        print("No creatives found - skipping next script")
+            print("No creatives found - skipping next script")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -298,8 +298,8 @@ class MediaMonitorsTracker:
         
         return filename
 
-def parse_arguments():
-    """Parse command line arguments"""
+def parse_arguments(argv=None):
+    """Parse command line arguments (argv defaults to sys.argv[1:])"""
     parser = argparse.ArgumentParser(
         description='Fetch media monitoring metadata for a date range',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -321,7 +321,7 @@ Examples:
     parser.add_argument('--end', required=True,
                        help='End datetime in format "MM/DD/YYYY HH:MM:SS"')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 def validate_datetime_format(dt_str):
     """Validate datetime string format"""
@@ -331,9 +331,9 @@ def validate_datetime_format(dt_str):
     except ValueError:
         return False
 
-def main():
+def main(argv=None):
     # Parse command line arguments
-    args = parse_arguments()
+    args = parse_arguments(argv)
     
     # Validate datetime formats
     if not validate_datetime_format(args.start):
@@ -28,6 +28,7 @@ FAILED_ADS_FOLDER = os.path.join(PROJECT_ROOT, "failed_ads")
 BATCH_SIZE = 10
 BATCH_TIMEOUT = 60  # 1 minute per batch
 BATCH_START_DELAY = 5  # 5 seconds between batch starts
+PHASE2_DONE_FILE = "phase2.done"  # Sentinel for Phase 3 --watch mode
 
 def ensure_folders():
     """Create necessary folders if they don't exist"""
@@ -62,9 +63,11 @@ def convert_time_format(time_str):
         dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
     return dt.strftime("%Y%m%d-%H:%M:%S")
 
-def create_ini_file(creative, ini_folder, target_folder):
+def create_ini_file(creative, ini_dir, target_dir_str):
     """
     Create .ini file for a creative
+    ini_dir is a Path to the INI folder, target_dir_str the target folder
+    with its trailing backslash already appended
     """
     aircheck_id = creative["aircheck_id"]
     station_id = creative["station_id"]
@@ -78,14 +81,13 @@ def create_ini_file(creative, ini_folder, target_folder):
 /i:{aircheck_id}
 /s:{start_time}
 /e:{end_time}
-/t:{target_folder}\\
+/t:{target_dir_str}
 /n:{aircheck_id}
 /l"""
     
     ini_filename = f"{aircheck_id}.ini"
-    ini_filepath = os.path.join(ini_folder, ini_filename)
     
-    with open(ini_filepath, 'w') as f:
+    with open(ini_dir / ini_filename, 'w') as f:
         f.write(ini_content)
     
     return ini_filename
@@ -308,8 +310,8 @@ def save_failed_creatives(failed_creatives, datetime_range_str):
     print(f"✓ Failed creatives saved to: {failed_file}")
     return failed_file
 
-def parse_arguments():
-    """Parse command line arguments"""
+def parse_arguments(argv=None):
+    """Parse command line arguments (argv defaults to sys.argv[1:])"""
     parser = argparse.ArgumentParser(
         description='Download creative audio files from Media Monitors',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -328,17 +330,19 @@ Examples:
     parser.add_argument('--retry', action='store_true',
                        help='Retry failed downloads (disabled by default)')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
-def main():
+def main(argv=None):
     # Parse arguments
-    args = parse_arguments()
+    args = parse_arguments(argv)
     json_path = args.json
     enable_retry = args.retry
     
     # Ensure folders exist
     ensure_folders()
     
+    target_folder = None
+    
     try:
         # Read JSON file
         with open(json_path, 'r') as f:
@@ -368,6 +372,9 @@ def main():
         os.makedirs(ini_folder, exist_ok=True)
         os.makedirs(target_folder, exist_ok=True)
         
+        # A sentinel left by an earlier run would end a --watch Phase 3 too early
+        Path(target_folder, PHASE2_DONE_FILE).unlink(missing_ok=True)
+        
         print(f"✓ Created INI folder: {ini_folder}")
         print(f"✓ Created temp folder: {target_folder}\n")
         
@@ -379,8 +386,10 @@ def main():
         
         # Create all .ini files first
         print("Creating all .ini files...")
+        ini_dir = Path(ini_folder)
+        target_dir_str = f"{target_folder}\\"
         for creative in creatives:
-            create_ini_file(creative, ini_folder, target_folder)
+            create_ini_file(creative, ini_dir, target_dir_str)
         print(f"✓ Created {total_count} .ini files\n")
         
         # Process in batches with overlapping execution
@@ -472,6 +481,11 @@ def main():
         print(f"Unexpected error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # Tell a Phase 3 running in --watch mode that no more files are coming,
+        # whether or not this run succeeded
+        if target_folder and os.path.isdir(target_folder):
+            Path(target_folder, PHASE2_DONE_FILE).touch()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,14 +1,26 @@
 import os
+import sys
 import argparse
+import hashlib
+import json
+import logging
+import logging.handlers
+import random
+import time
 import shutil
-import pickle
-from pathlib import Path
+import stat
+import threading
+import queue
+import concurrent.futures
 from datetime import datetime
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from googleapiclient.errors import HttpError
+import httplib2
 import socket
 
 # =============================================================================
@@ -22,7 +34,9 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 # Credentials
 CREDENTIALS_FOLDER = os.path.join(PROJECT_ROOT, "credentials")
 CLIENT_SECRET_FILE = os.path.join(CREDENTIALS_FOLDER, "client_secret.json")
-TOKEN_FILE = os.path.join(CREDENTIALS_FOLDER, "token.pickle")
+TOKEN_FILE = os.path.join(CREDENTIALS_FOLDER, "token.json")
+LEGACY_TOKEN_FILE = os.path.join(CREDENTIALS_FOLDER, "token.pickle")  # Migrated to TOKEN_FILE on first run
+FOLDER_CACHE_FILE = os.path.join(CREDENTIALS_FOLDER, "folder_cache.json")  # Drive folder name -> ID
 
 # Google Drive settings
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
@@ -31,6 +45,31 @@ MAIN_FOLDER_NAME = "ads"  # Main folder in Drive root
 # Timeout settings (in seconds)
 SOCKET_TIMEOUT = 120  # 2 minutes for socket operations
 
+# Upload settings
+UPLOAD_WORKERS = 16  # Max files uploaded in parallel
+UPLOAD_START_CONCURRENCY = 4  # Parallel uploads before the limit adapts
+UPLOAD_LIMIT_LOG_EVERY = 20  # Report the current limit every N uploads
+MAX_WRITES_PER_SECOND = 10  # Drive's per-user write cap; upload starts are spaced to match
+SIMPLE_UPLOAD_LIMIT = 5 * 1024 * 1024  # Files up to 5MB go in a single request
+UPLOAD_CHUNK_SIZE = 20 * 1024 * 1024  # Chunk size for larger resumable uploads (multiple of 256KB)
+PREFETCH_CHUNKS = 1  # Chunks read ahead from disk while uploading
+READ_BUFFER_SIZE = 1024 * 1024  # Buffer for upload file handles (default is 8KB)
+
+# Cleanup settings
+CLEANUP_WORKERS = 8  # Files deleted in parallel
+CLEANUP_ERRORS_SHOWN = 3  # Failed deletions listed individually in the summary
+
+# Retry settings for Drive API errors
+MAX_API_ATTEMPTS = 5
+MAX_BACKOFF = 60  # seconds, before jitter
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ('userRateLimitExceeded', 'rateLimitExceeded')
+
+# Watch mode settings (--watch)
+WATCH_POLL_INTERVAL = 2  # seconds between temp folder scans
+WATCH_IDLE_TIMEOUT = 30 * 60  # give up watching after this many seconds without new or growing files
+PHASE2_DONE_FILE = "phase2.done"  # Sentinel written by Phase 2 when it finishes
+
 # Paths
 TEMP_BASE_PATH = r"C:\temp"
 INI_BASE_PATH = r"C:\Program Files\Media Monitors"
@@ -42,6 +81,18 @@ INI_BASE_PATH = r"C:\Program Files\Media Monitors"
 # Set default socket timeout
 socket.setdefaulttimeout(SOCKET_TIMEOUT)
 
+# Per-thread Drive services (httplib2 connections are not thread-safe)
+thread_local = threading.local()
+
+# Progress output from upload threads; written straight to stdout, or through
+# a background listener while uploads run (see BufferedUploadLog)
+log = logging.getLogger("upload_to_drive")
+log.setLevel(logging.INFO)
+log.propagate = False
+log_stream_handler = logging.StreamHandler(sys.stdout)
+log_stream_handler.setFormatter(logging.Formatter('%(message)s'))
+log.addHandler(log_stream_handler)
+
 def print_header(title):
     """Print a formatted header"""
     print(f"\n{'='*80}")
@@ -54,16 +105,193 @@ def print_section(title):
     print(f"  {title}")
     print(f"{'-'*80}\n")
 
+class BufferedUploadLog:
+    """
+    Context manager that routes the upload log through a queue while uploads run,
+    so upload threads never wait on console writes
+    All queued lines are written out before the block exits
+    """
+    
+    def __enter__(self):
+        log_queue = queue.Queue()
+        self.queue_handler = logging.handlers.QueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, log_stream_handler)
+        
+        log.removeHandler(log_stream_handler)
+        log.addHandler(self.queue_handler)
+        self.listener.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        log.removeHandler(self.queue_handler)
+        log.addHandler(log_stream_handler)
+        self.listener.stop()  # Drains the queue before returning
+
+def is_rate_limit_error(error):
+    """Check if a Drive HttpError is a 429 or a 403 rate limit response"""
+    status = error.resp.status
+    if status == 403:
+        content = error.content
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', 'replace')
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+    return status == 429
+
+def is_retryable_error(error):
+    """Check if a Drive HttpError is a rate limit or server error worth retrying"""
+    return error.resp.status in RETRYABLE_STATUS_CODES or is_rate_limit_error(error)
+
+def retry_delay(error, attempt):
+    """
+    Seconds to wait before the next attempt: the server's Retry-After if given,
+    otherwise exponential backoff with up to one second of jitter
+    """
+    retry_after = error.resp.get('retry-after') if isinstance(error, HttpError) else None
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), MAX_BACKOFF)
+    return min(2 ** attempt, MAX_BACKOFF) + random.uniform(0, 1)
+
+def reset_connections(http):
+    """
+    Close and forget the pooled connections of an (Authorized)Http object,
+    so the next request opens a fresh socket instead of reusing a dead one
+    """
+    http = getattr(http, 'http', http)  # Unwrap AuthorizedHttp
+    connections = getattr(http, 'connections', None)
+    if not connections:
+        return
+    
+    for connection in list(connections.values()):
+        try:
+            connection.close()
+        except Exception:
+            pass
+    connections.clear()
+
+def call_with_retry(call, http=None, max_attempts=MAX_API_ATTEMPTS, on_rate_limit=None,
+                    retry_timeouts=True):
+    """
+    Call a Drive API method (execute or next_chunk), retrying socket timeouts,
+    rate limit and server errors with exponential backoff and jitter
+    A socket timeout also drops the pooled connections of `http`
+    on_rate_limit, if given, is called for every rate limit response
+    retry_timeouts=False re-raises socket timeouts straight away, for calls
+    that may have taken effect anyway and must not simply be sent again
+    """
+    for attempt in range(max_attempts):
+        try:
+            return call()
+        except socket.timeout as e:
+            reset_connections(http)
+            if not retry_timeouts or attempt == max_attempts - 1:
+                raise
+            delay = retry_delay(e, attempt)
+            log.warning(f"  ⚠ Drive request timed out, retrying on a new connection in {delay:.1f}s "
+                        f"({attempt + 1}/{max_attempts})...")
+            time.sleep(delay)
+        except HttpError as e:
+            if on_rate_limit and is_rate_limit_error(e):
+                on_rate_limit()
+            if attempt == max_attempts - 1 or not is_retryable_error(e):
+                raise
+            delay = retry_delay(e, attempt)
+            log.warning(f"  ⚠ Drive returned {e.resp.status}, retrying in {delay:.1f}s "
+                         f"({attempt + 1}/{max_attempts})...")
+            time.sleep(delay)
+
+def execute_with_retry(request, max_attempts=MAX_API_ATTEMPTS, on_rate_limit=None,
+                       retry_timeouts=True):
+    """
+    Execute a Drive API request with call_with_retry
+    Pass the request object itself (not a lambda) so it can be re-executed
+    """
+    return call_with_retry(request.execute, getattr(request, 'http', None),
+                           max_attempts, on_rate_limit, retry_timeouts)
+
+class AdaptiveLimit:
+    """
+    Concurrency limit for uploads: grows by one after every successful upload
+    and halves whenever Drive rate-limits a request, so throughput settles
+    just under the per-user quota
+    Upload starts are also spaced at least 1/max_rate seconds apart
+    """
+    
+    def __init__(self, initial, maximum, max_rate=MAX_WRITES_PER_SECOND):
+        self.limit = initial
+        self.maximum = maximum
+        self.active = 0
+        self.completed = 0
+        self.start_interval = 1.0 / max_rate
+        self.next_start = 0.0
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """Wait until fewer than `limit` uploads are running and the next start slot comes up"""
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+            
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.start_interval
+        
+        if start > now:
+            time.sleep(start - now)
+    
+    def release(self, success):
+        """Finish an upload, raising the limit by one if it succeeded"""
+        with self.condition:
+            self.active -= 1
+            self.completed += 1
+            if success and self.limit < self.maximum:
+                self.limit += 1
+            if self.completed % UPLOAD_LIMIT_LOG_EVERY == 0:
+                log.info(f"  ⋯ {self.completed} uploads finished, parallel limit now {self.limit}")
+            self.condition.notify_all()
+    
+    def throttle(self):
+        """Halve the limit after a rate limit response"""
+        with self.condition:
+            self.limit = max(1, self.limit // 2)
+
+def build_drive_service(creds):
+    """
+    Build a Drive service on its own keep-alive HTTP connection
+    Uses the discovery document bundled with google-api-python-client 2.0+,
+    so no discovery request or discovery cache file I/O happens per build
+    """
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=SOCKET_TIMEOUT))
+    return build('drive', 'v3', http=http, static_discovery=True, cache_discovery=False)
+
+def get_drive_service(creds):
+    """
+    Return the calling thread's Drive service, building it on first use
+    Each upload thread gets its own service and HTTP connection
+    """
+    service = getattr(thread_local, 'service', None)
+    if service is None:
+        service = build_drive_service(creds)
+        thread_local.service = service
+    return service
+
 def authenticate_drive():
-    """Authenticate using OAuth 2.0 and return Google Drive service"""
+    """Authenticate using OAuth 2.0 and return Google Drive credentials"""
     try:
         creds = None
         
-        # Check if token.pickle exists (saved credentials)
+        # Check if token.json exists (saved credentials)
         if os.path.exists(TOKEN_FILE):
             print("Loading saved credentials...")
-            with open(TOKEN_FILE, 'rb') as token:
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        elif os.path.exists(LEGACY_TOKEN_FILE):
+            # Older runs saved a pickle; convert it once instead of re-authenticating
+            print("Migrating saved credentials from token.pickle...")
+            import pickle
+            with open(LEGACY_TOKEN_FILE, 'rb') as token:
                 creds = pickle.load(token)
+            with open(TOKEN_FILE, 'w') as token:
+                token.write(creds.to_json())
         
         # If no valid credentials, let user log in
         if not creds or not creds.valid:
@@ -88,19 +316,15 @@ def authenticate_drive():
             
             # Save credentials for next time
             print("Saving credentials...")
-            with open(TOKEN_FILE, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(TOKEN_FILE, 'w') as token:
+                token.write(creds.to_json())
         
-        # Build service
+        # Build service (connection problems surface on the first real request)
         print("Building Drive service...")
-        service = build('drive', 'v3', credentials=creds)
-        
-        # Test connection
-        print("Testing connection...")
-        service.files().list(pageSize=1).execute()
+        get_drive_service(creds)
         
         print("✓ Authenticated with Google Drive")
-        return service
+        return creds
         
     except Exception as e:
         print(f"✗ Authentication failed: {e}")
@@ -108,108 +332,209 @@ def authenticate_drive():
         traceback.print_exc()
         return None
 
-def find_folder_by_name(service, folder_name, parent_id=None, retries=3):
+def escape_query_value(value):
+    """Escape backslashes and single quotes for use inside a Drive query string"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+def folder_query(folder_name, parent_id=None):
+    """Build the Drive query that finds a folder by name, optionally inside a parent"""
+    query = f"name='{escape_query_value(folder_name)}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+    
+    if parent_id:
+        query += f" and '{escape_query_value(parent_id)}' in parents"
+    
+    return query
+
+def find_folder_by_name(service, folder_name, parent_id=None):
     """
-    Find folder by name in Drive with retry logic
+    Find folder by name in Drive (timeouts are retried by execute_with_retry)
     Returns folder ID if found, None otherwise
     """
-    for attempt in range(retries):
-        try:
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            
-            if parent_id:
-                query += f" and '{parent_id}' in parents"
-            
-            results = service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)',
-                pageSize=1
-            ).execute()
-            
-            files = results.get('files', [])
-            
-            if files:
-                return files[0]['id']
-            return None
-            
-        except socket.timeout:
-            if attempt < retries - 1:
-                print(f"  ⚠ Timeout, retrying ({attempt + 1}/{retries})...")
-                continue
-            else:
-                print(f"  ✗ Failed after {retries} attempts")
-                return None
-        except HttpError as e:
-            print(f"✗ Error searching for folder: {e}")
-            return None
+    try:
+        results = execute_with_retry(service.files().list(
+            q=folder_query(folder_name, parent_id),
+            spaces='drive',
+            fields='files(id)',
+            pageSize=1
+        ))
+        
+        files = results.get('files', [])
+        
+        if files:
+            return files[0]['id']
+        return None
+        
+    except socket.timeout:
+        print(f"  ✗ Timed out searching for folder after {MAX_API_ATTEMPTS} attempts")
+        return None
+    except HttpError as e:
+        print(f"✗ Error searching for folder: {e}")
+        return None
 
-def create_folder(service, folder_name, parent_id=None, retries=3):
+def create_folder(service, folder_name, parent_id=None):
     """
-    Create a folder in Google Drive with retry logic
+    Create a folder in Google Drive (timeouts are retried by execute_with_retry)
     Returns folder ID
     """
-    for attempt in range(retries):
-        try:
-            file_metadata = {
-                'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder'
-            }
-            
-            if parent_id:
-                file_metadata['parents'] = [parent_id]
-            
-            folder = service.files().create(
-                body=file_metadata,
-                fields='id'
-            ).execute()
-            
-            print(f"✓ Created folder: {folder_name}")
-            return folder.get('id')
-            
-        except socket.timeout:
-            if attempt < retries - 1:
-                print(f"  ⚠ Timeout, retrying ({attempt + 1}/{retries})...")
-                continue
-            else:
-                print(f"  ✗ Failed after {retries} attempts")
-                return None
-        except HttpError as e:
-            print(f"✗ Error creating folder: {e}")
-            return None
+    try:
+        file_metadata = {
+            'name': folder_name,
+            'mimeType': 'application/vnd.google-apps.folder'
+        }
+        
+        if parent_id:
+            file_metadata['parents'] = [parent_id]
+        
+        folder = execute_with_retry(service.files().create(
+            body=file_metadata,
+            fields='id'
+        ))
+        
+        print(f"✓ Created folder: {folder_name}")
+        return folder.get('id')
+        
+    except socket.timeout:
+        print(f"  ✗ Timed out creating folder after {MAX_API_ATTEMPTS} attempts")
+        return None
+    except HttpError as e:
+        print(f"✗ Error creating folder: {e}")
+        return None
+
+def load_folder_cache():
+    """Load the cached Drive folder IDs, or an empty dict if there is no usable cache"""
+    try:
+        with open(FOLDER_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_folder_cache(cache):
+    """Write the folder ID cache atomically so a crash never leaves a partial file"""
+    tmp_file = FOLDER_CACHE_FILE + ".tmp"
+    try:
+        os.makedirs(CREDENTIALS_FOLDER, exist_ok=True)
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_file, FOLDER_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠ Could not save folder cache: {e}")
+
+def find_folders_batched(service, cached_main_id, date_range_folder_name):
+    """
+    Look up the main folder and the date-range folder in one batch request
+    The main folder is checked by its cached ID if there is one, otherwise by name
+    The date folder is searched by name in any parent; the caller matches parents
+    Returns (main folder ID or None, list of date folder candidates)
+    """
+    responses = {}
+    
+    def collect(request_id, response, exception):
+        responses[request_id] = (response, exception)
+    
+    batch = service.new_batch_http_request(callback=collect)
+    
+    if cached_main_id:
+        batch.add(service.files().get(fileId=cached_main_id, fields='id, trashed'),
+                  request_id='main')
+    else:
+        batch.add(service.files().list(
+            q=folder_query(MAIN_FOLDER_NAME),
+            spaces='drive',
+            fields='files(id)',
+            pageSize=1
+        ), request_id='main')
+    
+    batch.add(service.files().list(
+        q=folder_query(date_range_folder_name),
+        spaces='drive',
+        fields='files(id, parents)',
+        pageSize=100
+    ), request_id='date')
+    
+    execute_with_retry(batch)
+    
+    main_response, main_error = responses['main']
+    date_response, date_error = responses['date']
+    
+    if main_error is not None:
+        # A cached ID that no longer exists is a cache miss, not a failure
+        if not (cached_main_id and isinstance(main_error, HttpError) and main_error.resp.status == 404):
+            raise main_error
+        main_folder_id = None
+    elif cached_main_id:
+        main_folder_id = None if main_response.get('trashed') else main_response['id']
+    else:
+        files = main_response.get('files', [])
+        main_folder_id = files[0]['id'] if files else None
+    
+    if date_error is not None:
+        raise date_error
+    
+    return main_folder_id, date_response.get('files', [])
 
 def ensure_folder_structure(service, date_range_folder_name):
     """
     Ensure ads/date-range/ folder structure exists
-    Returns the date-range folder ID
+    The main folder ID is cached between runs in FOLDER_CACHE_FILE
+    Both folders are looked up in one batch request, falling back to
+    one request at a time if the batch fails
+    Returns (date-range folder ID, True if the date folder was just created),
+    or (None, False) on failure
     """
     print_section("SETTING UP DRIVE FOLDERS")
     
-    # Find or create main "ads" folder
-    print(f"Looking for main folder '{MAIN_FOLDER_NAME}'...")
-    main_folder_id = find_folder_by_name(service, MAIN_FOLDER_NAME)
+    folder_cache = load_folder_cache()
+    cached_main_id = folder_cache.get(MAIN_FOLDER_NAME)
     
-    if not main_folder_id:
-        print(f"Main folder '{MAIN_FOLDER_NAME}' not found, creating it...")
-        main_folder_id = create_folder(service, MAIN_FOLDER_NAME)
-        if not main_folder_id:
-            return None
+    print(f"Looking for folders '{MAIN_FOLDER_NAME}/{date_range_folder_name}'...")
+    try:
+        main_folder_id, date_candidates = find_folders_batched(
+            service, cached_main_id, date_range_folder_name
+        )
+        batched = True
+    except (socket.timeout, HttpError) as e:
+        print(f"⚠ Batch folder lookup failed, looking up folders one by one: {e}")
+        main_folder_id, date_candidates = None, []
+        batched = False
+    
+    # Find or create main "ads" folder
+    if main_folder_id:
+        cached = " (cached)" if main_folder_id == cached_main_id else ""
+        print(f"✓ Found main folder: {MAIN_FOLDER_NAME}{cached}")
     else:
-        print(f"✓ Found main folder: {MAIN_FOLDER_NAME}")
+        # A stale cached ID was only checked by ID, so the name search is still needed
+        if not batched or cached_main_id:
+            main_folder_id = find_folder_by_name(service, MAIN_FOLDER_NAME)
+        
+        if not main_folder_id:
+            print(f"Main folder '{MAIN_FOLDER_NAME}' not found, creating it...")
+            main_folder_id = create_folder(service, MAIN_FOLDER_NAME)
+            if not main_folder_id:
+                return None, False
+        else:
+            print(f"✓ Found main folder: {MAIN_FOLDER_NAME}")
+    
+    if main_folder_id != cached_main_id:
+        folder_cache[MAIN_FOLDER_NAME] = main_folder_id
+        save_folder_cache(folder_cache)
     
     # Find or create date-range subfolder
-    print(f"Looking for date folder '{date_range_folder_name}'...")
-    date_folder_id = find_folder_by_name(service, date_range_folder_name, main_folder_id)
+    if batched:
+        date_folder_id = next((f['id'] for f in date_candidates
+                               if main_folder_id in f.get('parents', [])), None)
+    else:
+        date_folder_id = find_folder_by_name(service, date_range_folder_name, main_folder_id)
     
     if not date_folder_id:
         print(f"Date folder '{date_range_folder_name}' not found, creating it...")
         date_folder_id = create_folder(service, date_range_folder_name, main_folder_id)
         if not date_folder_id:
-            return None
-    else:
-        print(f"✓ Found date folder: {date_range_folder_name}")
+            return None, False
+        return date_folder_id, True
     
-    return date_folder_id
+    print(f"✓ Found date folder: {date_range_folder_name}")
+    return date_folder_id, False
 
 def file_exists_in_folder(service, filename, folder_id):
     """
@@ -217,202 +542,591 @@ def file_exists_in_folder(service, filename, folder_id):
     Returns True if exists, False otherwise
     """
     try:
-        query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
+        query = f"name='{escape_query_value(filename)}' and '{escape_query_value(folder_id)}' in parents and trashed=false"
         
-        results = service.files().list(
+        results = execute_with_retry(service.files().list(
             q=query,
             spaces='drive',
-            fields='files(id, name)',
+            fields='files(id)',
             pageSize=1
-        ).execute()
+        ))
         
         files = results.get('files', [])
         return len(files) > 0
         
     except socket.timeout:
-        print(f"  ⚠ Timeout checking file existence for {filename}")
+        log.warning(f"  ⚠ Timeout checking file existence for {filename}")
         return False
     except HttpError as e:
-        print(f"✗ Error checking file existence: {e}")
+        log.error(f"✗ Error checking file existence: {e}")
+        return False
+
+def list_existing_files(service, folder_id):
+    """
+    List all files already in the folder, one page of 1000 at a time
+    Pages are fetched one after another: each pageToken only comes back with
+    the previous page, so follow-up pages cannot be packed into a batch request
+    Returns dict of filename -> {'id', 'name', 'md5Checksum', 'size'}
+    """
+    query = f"'{escape_query_value(folder_id)}' in parents and trashed=false"
+    existing_files = {}
+    page_token = None
+    
+    while True:
+        results = execute_with_retry(service.files().list(
+            q=query,
+            spaces='drive',
+            fields='nextPageToken, files(id, name, md5Checksum, size)',
+            pageSize=1000,
+            pageToken=page_token
+        ))
+        
+        for drive_file in results.get('files', []):
+            existing_files[drive_file['name']] = drive_file
+        
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return existing_files
+
+def file_md5(file_path):
+    """Compute the MD5 hex digest of a local file"""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'md5').hexdigest()
+        
+        md5 = hashlib.md5()
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(block)
+        return md5.hexdigest()
+
+def matches_drive_file(file_path, file_size, drive_file):
+    """
+    Check if a local file is identical to its Drive copy
+    Compares size first and only hashes the file when sizes match
+    """
+    if file_size != int(drive_file.get('size', -1)):
         return False
+    return file_md5(file_path) == drive_file.get('md5Checksum')
+
+def delete_entries(entries):
+    """
+    Delete directory entries in parallel
+    Returns count of files deleted
+    """
+    deleted = 0
+    errors = []
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+        futures = {executor.submit(os.unlink, entry.path): entry for entry in entries}
+        
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+                deleted += 1
+            except OSError as e:
+                errors.append((futures[future].name, e))
+    
+    # One summary instead of a line per failure
+    if errors:
+        log.warning(f"  ⚠ Failed to delete {len(errors)} files:")
+        for name, error in errors[:CLEANUP_ERRORS_SHOWN]:
+            log.warning(f"      {name}: {error}")
+        if len(errors) > CLEANUP_ERRORS_SHOWN:
+            log.warning(f"      ... and {len(errors) - CLEANUP_ERRORS_SHOWN} more")
+    
+    return deleted
 
 def cleanup_temp_folder(temp_folder):
     """
-    Clean temp folder: delete non-PCM files, then rename PCM files
-    Returns count of files ready for upload
+    Clean temp folder: rename PCM files over their compressed versions,
+    then delete leftover .wav, .out and .ini files
+    The renames happen lazily as the returned iterator is consumed, so uploads
+    can start with the first renamed file instead of after the whole cleanup
+    Files are produced largest first as (path, size) tuples, with sizes from the scan
+    Returns (count of files ready for upload, iterator of (path, size))
     """
     print_section("CLEANING TEMP FOLDER")
     
-    temp_path = Path(temp_folder)
-    
-    if not temp_path.exists():
+    if not os.path.exists(temp_folder):
         print(f"✗ Temp folder not found: {temp_folder}")
-        return 0
+        return 0, iter(())
     
-    # SAFETY CHECK: If no PCM files exist, assume cleanup already done
-    pcm_files = list(temp_path.glob("*_pcm.wav"))
-    regular_wav_files = [f for f in temp_path.glob("*.wav") if not f.name.endswith("_pcm.wav")]
+    # Classify every entry in a single directory pass, dispatching on the extension
+    pcm_files = []
+    regular_wav_files = []
+    out_files = []
+    ini_files = []
+    files_by_extension = {'.out': out_files, '.ini': ini_files}
+    
+    with os.scandir(temp_folder) as entries:
+        for entry in entries:
+            name = entry.name
+            extension = name[-4:]
+            if extension == ".wav":
+                if name[-8:] == "_pcm.wav":
+                    pcm_files.append(entry)
+                else:
+                    regular_wav_files.append(entry)
+            else:
+                bucket = files_by_extension.get(extension)
+                if bucket is not None:
+                    bucket.append(entry)
     
+    # SAFETY CHECK: If no PCM files exist, assume cleanup already done
     if len(pcm_files) == 0 and len(regular_wav_files) > 0:
         print("✓ Cleanup already completed (found renamed .wav files)")
         print(f"  Found {len(regular_wav_files)} files ready for upload")
-        return len(regular_wav_files)
+        wav_files = [(entry.path, entry.stat().st_size) for entry in regular_wav_files]
+        wav_files.sort(key=lambda item: item[1], reverse=True)
+        return len(wav_files), iter(wav_files)
     
     if len(pcm_files) == 0:
         print("⚠ No PCM files found and no regular wav files either")
         print("  Temp folder may have been corrupted or already cleaned")
-        return 0
+        return 0, iter(())
     
-    # Continue with normal cleanup...
-    print(f"Found {len(pcm_files)} PCM files to process")
+    # Compressed versions of PCM files are replaced by the rename itself;
+    # any other compressed .wav files are deleted with the .out/.ini files
+    pcm_targets = {entry.name[:-8] + ".wav" for entry in pcm_files}
+    leftover_files = [entry for entry in regular_wav_files if entry.name not in pcm_targets]
+    leftover_files += out_files + ini_files
     
-    # Step 1: Delete all non-PCM .wav files (compressed versions)
-    print("\nStep 1: Deleting compressed .wav files (non-PCM)...")
-    deleted_wav = 0
-    for wav_file in regular_wav_files:
-        try:
-            wav_file.unlink()
-            deleted_wav += 1
-        except Exception as e:
-            print(f"  ⚠ Failed to delete {wav_file.name}: {e}")
+    print(f"Found {len(pcm_files)} PCM files to rename and upload")
+    print(f"  {len(leftover_files)} compressed .wav, .out and .ini files will be deleted once renamed")
+    
+    # Largest first, so a big file never starts last and holds up the finish
+    pcm_files.sort(key=lambda entry: entry.stat().st_size, reverse=True)
     
-    print(f"  ✓ Deleted {deleted_wav} compressed .wav files")
+    return len(pcm_files), rename_pcm_files(pcm_files, leftover_files)
+
+def rename_pcm_files(pcm_files, leftover_files):
+    """
+    Rename each PCM file (remove _pcm suffix, replacing its compressed version)
+    and yield (path, size) to upload; leftover files are deleted after the last rename
+    A file that cannot be renamed is yielded under its original path
+    """
+    renamed_count = 0
     
-    # Step 2: Delete .out files
-    print("\nStep 2: Deleting .out files...")
-    deleted_out = 0
-    for out_file in temp_path.glob("*.out"):
+    for entry in pcm_files:
+        target = entry.path[:-8] + ".wav"
+        size = entry.stat().st_size  # Cached from the scan on Windows
         try:
-            out_file.unlink()
-            deleted_out += 1
-        except Exception as e:
-            print(f"  ⚠ Failed to delete {out_file.name}: {e}")
+            os.replace(entry.path, target)
+            renamed_count += 1
+            yield target, size
+        except OSError as e:
+            log.warning(f"  ⚠ Failed to rename {entry.name}: {e}")
+            yield entry.path, size
     
-    print(f"  ✓ Deleted {deleted_out} .out files")
+    deleted_count = delete_entries(leftover_files)
+    log.info(f"  ✓ Cleanup complete: renamed {renamed_count} PCM files, "
+             f"deleted {deleted_count} leftover files")
+
+class PrefetchingMediaUpload(MediaIoBaseUpload):
+    """
+    Resumable wav upload that reads the next chunks from disk on a background
+    thread while the current chunk is being sent
+    With prefetch=False (a file of one or two chunks, where nothing would
+    overlap) no thread is started and chunks are read on demand
+    """
     
-    # Step 3: Delete .ini files (if any)
-    print("\nStep 3: Deleting .ini files...")
-    deleted_ini = 0
-    for ini_file in temp_path.glob("*.ini"):
-        try:
-            ini_file.unlink()
-            deleted_ini += 1
-        except Exception as e:
-            print(f"  ⚠ Failed to delete {ini_file.name}: {e}")
+    def __init__(self, file_path, chunksize, prefetch=True):
+        self.file_path = file_path
+        self.fh = open(file_path, 'rb', buffering=READ_BUFFER_SIZE)
+        super().__init__(self.fh, mimetype='audio/wav', chunksize=chunksize, resumable=True)
+        
+        self.next_offset = 0
+        self.prefetching = prefetch
+        self.stopped = threading.Event()
+        if prefetch:
+            self.chunks = queue.Queue(maxsize=PREFETCH_CHUNKS)
+            self.reader = threading.Thread(target=self.read_ahead, daemon=True)
+            self.reader.start()
     
-    print(f"  ✓ Deleted {deleted_ini} .ini files")
+    def __enter__(self):
+        return self
     
-    # Step 4: Rename PCM files (remove _pcm suffix)
-    print("\nStep 4: Renaming PCM files...")
-    renamed_count = 0
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
-    for pcm_file in pcm_files:
+    def read_ahead(self):
+        """Read the file chunk by chunk in order and queue each chunk with its offset"""
         try:
-            new_name = pcm_file.name.replace("_pcm.wav", ".wav")
-            new_path = pcm_file.parent / new_name
-            pcm_file.rename(new_path)
-            renamed_count += 1
-        except Exception as e:
-            print(f"  ⚠ Failed to rename {pcm_file.name}: {e}")
+            with open(self.file_path, 'rb', buffering=READ_BUFFER_SIZE) as fh:
+                offset = 0
+                while True:
+                    data = fh.read(self.chunksize())
+                    if not self.put_chunk((offset, data)) or not data:
+                        return
+                    offset += len(data)
+        except OSError:
+            self.put_chunk(None)
+    
+    def put_chunk(self, item):
+        """Queue a chunk, giving up once the upload has been closed"""
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
     
-    print(f"  ✓ Renamed {renamed_count} PCM files")
+    def has_stream(self):
+        """Make next_chunk() ask for bytes through getbytes()"""
+        return False
     
-    print(f"\n✓ Cleanup complete: {renamed_count} files ready for upload")
+    def getbytes(self, begin, length):
+        """Return the prefetched chunk, or read directly if a chunk is being resent"""
+        if self.prefetching and begin == self.next_offset:
+            item = self.chunks.get()
+            if item is not None and item[0] == begin:
+                data = item[1][:length]
+                self.next_offset = begin + len(data)
+                return data
+            self.prefetching = False
+        
+        self.fh.seek(begin)
+        return self.fh.read(length)
     
-    return renamed_count
+    def close(self):
+        """Stop the read-ahead thread and close the file"""
+        self.stopped.set()
+        self.fh.close()
 
-def upload_file(service, file_path, folder_id, retries=3):
+def upload_request(service, filename, folder_id, media, replace_file_id=None):
+    """
+    Build the Drive request that uploads media as a new file in the folder,
+    or as new content for an existing file when replace_file_id is given
+    """
+    if replace_file_id:
+        return service.files().update(
+            fileId=replace_file_id,
+            media_body=media,
+            fields='id'
+        )
+    
+    file_metadata = {
+        'name': filename,
+        'parents': [folder_id]
+    }
+    
+    return service.files().create(
+        body=file_metadata,
+        media_body=media,
+        fields='id'
+    )
+
+def upload_file(service, file_path, folder_id, retries=3, on_rate_limit=None, replace_file_id=None,
+                drive_name=None, file_size=None):
     """
     Upload a single file to Google Drive folder with retry logic
+    Does not check for an existing copy up front; the caller decides what to skip.
+    A timed-out single-request create is not re-sent blindly: the next attempt
+    first checks Drive, since the timed-out create may have landed
+    on_rate_limit is passed through to execute_with_retry
+    replace_file_id overwrites that Drive file instead of creating a new one
+    drive_name overrides the local filename in Drive
+    file_size saves a stat call when the caller already knows it
     Returns True if successful, False otherwise
     """
-    filename = os.path.basename(file_path)
+    filename = drive_name or os.path.basename(file_path)
+    if file_size is None:
+        file_size = os.path.getsize(file_path)
     
     for attempt in range(retries):
+        request = None
         try:
-            # Check if file already exists
-            if file_exists_in_folder(service, filename, folder_id):
-                print(f"  ⊘ Skipped (already exists): {filename}")
+            if attempt > 0 and not replace_file_id and file_exists_in_folder(service, filename, folder_id):
+                log.info(f"  ✓ {filename} reached Drive before the timeout, not re-uploading")
                 return True
             
-            # Upload file
-            file_metadata = {
-                'name': filename,
-                'parents': [folder_id]
-            }
-            
-            media = MediaFileUpload(
-                file_path,
-                mimetype='audio/wav',
-                resumable=True,
-                chunksize=5 * 1024 * 1024  # 5MB chunks
-            )
-            
-            request = service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id'
-            )
+            # Small files skip the resumable session and upload in one request
+            if file_size <= SIMPLE_UPLOAD_LIMIT:
+                media = MediaFileUpload(
+                    file_path,
+                    mimetype='audio/wav',
+                    resumable=False,
+                    chunksize=-1
+                )
+                
+                # Timeouts come back here so a create that landed isn't sent twice;
+                # an update of the same file is safe to repeat
+                request = upload_request(service, filename, folder_id, media, replace_file_id)
+                execute_with_retry(
+                    request,
+                    on_rate_limit=on_rate_limit,
+                    retry_timeouts=bool(replace_file_id)
+                )
+                return True
             
-            # Upload with progress
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
+            # Larger files upload in chunks; files spanning several chunks
+            # read the next one from disk while the current one is sent
+            prefetch = file_size > 2 * UPLOAD_CHUNK_SIZE
+            with PrefetchingMediaUpload(file_path, UPLOAD_CHUNK_SIZE, prefetch) as media:
+                request = upload_request(service, filename, folder_id, media, replace_file_id)
+                
+                # Upload with progress
+                response = None
+                while response is None:
+                    # A failed chunk can be re-sent: the request resumes from
+                    # the last offset the server acknowledged
+                    status, response = call_with_retry(request.next_chunk, request.http,
+                                                       on_rate_limit=on_rate_limit)
             
-            print(f"  ✓ Uploaded: {filename}")
             return True
             
         except socket.timeout:
+            # The timed-out connection may be dead; don't let the retry reuse it
+            if request is not None:
+                reset_connections(request.http)
             if attempt < retries - 1:
-                print(f"  ⚠ Timeout uploading {filename}, retrying ({attempt + 1}/{retries})...")
+                log.warning(f"  ⚠ Timeout uploading {filename}, retrying ({attempt + 1}/{retries})...")
                 continue
             else:
-                print(f"  ✗ Failed to upload {filename} after {retries} attempts")
+                log.error(f"  ✗ Failed to upload {filename} after {retries} attempts")
                 return False
         except HttpError as e:
-            print(f"  ✗ Failed to upload {filename}: {e}")
+            log.error(f"  ✗ Failed to upload {filename}: {e}")
             return False
         except Exception as e:
-            print(f"  ✗ Error uploading {filename}: {e}")
+            log.error(f"  ✗ Error uploading {filename}: {e}")
             return False
 
-def upload_folder_contents(service, temp_folder, folder_id):
+def upload_worker(creds, file_path, file_size, folder_id, drive_file, limit, drive_name=None):
     """
-    Upload all .wav files from temp folder to Drive folder
-    Returns (success_count, failed_count, skipped_count)
+    Upload one file using the calling thread's Drive service,
+    once the adaptive limit allows another upload to start
+    drive_file is the existing Drive file with the same name, if any;
+    it is skipped when identical and overwritten when it differs
+    Returns 'uploaded', 'replaced', 'skipped' or 'failed'
     """
-    print_section("UPLOADING FILES TO DRIVE")
+    if drive_file and matches_drive_file(file_path, file_size, drive_file):
+        return 'skipped'
+    
+    service = get_drive_service(creds)
+    replace_file_id = drive_file['id'] if drive_file else None
     
-    wav_files = list(Path(temp_folder).glob("*.wav"))
+    limit.acquire()
+    success = False
+    try:
+        success = upload_file(service, file_path, folder_id,
+                              on_rate_limit=limit.throttle,
+                              replace_file_id=replace_file_id,
+                              drive_name=drive_name,
+                              file_size=file_size)
+    finally:
+        limit.release(success)
     
-    if not wav_files:
-        print(f"⚠ No .wav files found in {temp_folder}")
-        return 0, 0, 0
+    if not success:
+        return 'failed'
+    return 'replaced' if replace_file_id else 'uploaded'
+
+def upload_folder_contents(creds, wav_files, file_count, folder_id, folder_is_new=False):
+    """
+    Upload .wav files to Drive folder in parallel
+    wav_files is an iterable of (path, size), possibly an iterator
+    (see cleanup_temp_folder); each file is submitted as soon as it is produced
+    folder_is_new skips listing existing files, as a just-created folder is empty
+    Returns (success_count, failed_count, skipped_count)
+    """
+    print_section("UPLOADING FILES TO DRIVE")
     
-    print(f"Found {len(wav_files)} .wav files to upload\n")
+    print(f"Uploading {file_count} .wav files "
+          f"({UPLOAD_START_CONCURRENCY}-{UPLOAD_WORKERS} parallel)\n")
     
     success_count = 0
     failed_count = 0
     skipped_count = 0
     
-    for i, wav_file in enumerate(wav_files, 1):
-        print(f"[{i}/{len(wav_files)}] ", end="")
-        
-        # Check if already exists first
-        filename = wav_file.name
-        if file_exists_in_folder(service, filename, folder_id):
-            print(f"⊘ Skipped (already exists): {filename}")
-            skipped_count += 1
-            continue
+    # One listing of the folder instead of a query per file
+    try:
+        existing_files = {} if folder_is_new else list_existing_files(get_drive_service(creds), folder_id)
+    except (socket.timeout, HttpError) as e:
+        print(f"✗ Error listing existing files: {e}")
+        return 0, file_count, 0
+    
+    limit = AdaptiveLimit(UPLOAD_START_CONCURRENCY, UPLOAD_WORKERS)
+    
+    with BufferedUploadLog(), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        futures = {
+            executor.submit(upload_worker, creds, wav_file, file_size, folder_id,
+                            existing_files.get(os.path.basename(wav_file)), limit): wav_file
+            for wav_file, file_size in wav_files
+        }
         
-        success = upload_file(service, str(wav_file), folder_id)
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            filename = os.path.basename(futures[future])
+            outcome = report_upload_result(future, filename, f"[{i}/{len(futures)}]")
+            
+            if outcome == 'success':
+                success_count += 1
+            elif outcome == 'skipped':
+                skipped_count += 1
+            else:
+                failed_count += 1
+    
+    return success_count, failed_count, skipped_count
+
+def report_upload_result(future, filename, progress):
+    """
+    Print the result of a finished upload_worker future
+    Returns 'success', 'skipped' or 'failed' for the caller's tally
+    """
+    try:
+        result = future.result()
+    except Exception as e:
+        log.error(f"  ✗ Error uploading {filename}: {e}")
+        result = 'failed'
+    
+    if result == 'uploaded':
+        log.info(f"{progress} ✓ Uploaded: {filename}")
+        return 'success'
+    elif result == 'replaced':
+        log.info(f"{progress} ✓ Replaced (Drive copy differed): {filename}")
+        return 'success'
+    elif result == 'skipped':
+        log.info(f"{progress} ⊘ Skipped (already exists): {filename}")
+        return 'skipped'
+    else:
+        log.error(f"{progress} ✗ Failed: {filename}")
+        return 'failed'
+
+def watch_and_upload(creds, temp_folder, folder_id, folder_is_new=False):
+    """
+    Upload PCM files while Phase 2 is still writing them
+    A *_pcm.wav file is uploaded (as <id>.wav) once its size is unchanged
+    between two scans; the watch ends when Phase 2 writes its sentinel file,
+    or gives up after WATCH_IDLE_TIMEOUT seconds without any file activity
+    Once Phase 2 is done, files whose size changed after they were uploaded
+    (a download that stalled mid-write) are uploaded again over the Drive copy
+    Local files are left untouched so batch mode can still run afterwards
+    folder_is_new skips listing existing files, as a just-created folder is empty
+    Returns (success_count, failed_count, skipped_count, phase2_finished)
+    """
+    print_section("WATCHING TEMP FOLDER AND UPLOADING")
+    
+    sentinel = os.path.join(temp_folder, PHASE2_DONE_FILE)
+    print(f"Watching {temp_folder} every {WATCH_POLL_INTERVAL}s")
+    print(f"Waiting for Phase 2 to write {PHASE2_DONE_FILE}\n")
+    
+    counts = {'success': 0, 'failed': 0, 'skipped': 0}
+    
+    try:
+        existing_files = {} if folder_is_new else list_existing_files(get_drive_service(creds), folder_id)
+    except (socket.timeout, HttpError) as e:
+        print(f"✗ Error listing existing files: {e}")
+        return 0, 0, 0, False
+    
+    limit = AdaptiveLimit(UPLOAD_START_CONCURRENCY, UPLOAD_WORKERS)
+    last_sizes = {}  # pcm path -> size seen on the previous scan
+    submitted = {}  # pcm path -> size it was uploaded with
+    pending = {}  # future -> Drive filename
+    finished = 0
+    outcomes = {}  # Drive filename -> tallied outcome of its upload
+    last_activity = time.monotonic()
+    
+    with BufferedUploadLog(), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        while True:
+            # Check the sentinel before scanning so the last scan sees every file
+            phase2_done = os.path.exists(sentinel)
+            
+            if os.path.exists(temp_folder):
+                with os.scandir(temp_folder) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith("_pcm.wav") or entry.path in submitted:
+                            continue
+                        
+                        size = entry.stat().st_size
+                        if not phase2_done and (size == 0 or last_sizes.get(entry.path) != size):
+                            last_sizes[entry.path] = size
+                            last_activity = time.monotonic()
+                            continue
+                        
+                        drive_name = entry.name[:-8] + ".wav"
+                        future = executor.submit(upload_worker, creds, entry.path, size, folder_id,
+                                                 existing_files.get(drive_name), limit, drive_name)
+                        pending[future] = drive_name
+                        submitted[entry.path] = size
+                        last_activity = time.monotonic()
+            
+            # Report uploads that finished since the last scan
+            for future in [f for f in pending if f.done()]:
+                finished += 1
+                drive_name = pending.pop(future)
+                outcome = report_upload_result(future, drive_name, f"[{finished}/{len(submitted)}]")
+                counts[outcome] += 1
+                outcomes[drive_name] = outcome
+            
+            if phase2_done:
+                break
+            
+            if time.monotonic() - last_activity > WATCH_IDLE_TIMEOUT:
+                log.warning(f"⚠ No new files for {WATCH_IDLE_TIMEOUT}s and no {PHASE2_DONE_FILE}, "
+                            f"stopping the watch")
+                break
+            
+            time.sleep(WATCH_POLL_INTERVAL)
         
-        if success:
-            success_count += 1
+        if phase2_done:
+            log.info(f"✓ Phase 2 finished, waiting for {len(pending)} remaining uploads...")
         else:
-            failed_count += 1
+            log.info(f"Waiting for {len(pending)} remaining uploads...")
+        
+        for future in concurrent.futures.as_completed(pending):
+            finished += 1
+            outcome = report_upload_result(future, pending[future],
+                                           f"[{finished}/{len(submitted)}]")
+            counts[outcome] += 1
+            outcomes[pending[future]] = outcome
+        
+        # A file that sat still for one scan may still have been growing;
+        # now that Phase 2 is done, re-upload any that changed since
+        if phase2_done:
+            changed = []
+            for path, uploaded_size in submitted.items():
+                drive_name = os.path.basename(path)[:-8] + ".wav"
+                if outcomes[drive_name] == 'failed':
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size != uploaded_size:
+                    changed.append((path, size, drive_name))
+            
+            if changed:
+                log.info(f"⚠ {len(changed)} files changed after upload, uploading them again...")
+                try:
+                    existing_files = list_existing_files(get_drive_service(creds), folder_id)
+                except (socket.timeout, HttpError) as e:
+                    log.error(f"✗ Error listing existing files: {e}")
+                    existing_files = None
+                
+                reuploads = {}
+                for path, size, drive_name in changed:
+                    if existing_files is None:
+                        future = None
+                    else:
+                        future = executor.submit(upload_worker, creds, path, size, folder_id,
+                                                 existing_files.get(drive_name), limit, drive_name)
+                    reuploads[drive_name] = future
+                
+                for i, (drive_name, future) in enumerate(reuploads.items(), 1):
+                    if future is None:
+                        outcome = 'failed'
+                    else:
+                        outcome = report_upload_result(future, drive_name,
+                                                       f"[re-upload {i}/{len(reuploads)}]")
+                    
+                    # The file was already tallied once; a failed re-upload moves it to failed
+                    if outcome == 'failed':
+                        counts[outcomes[drive_name]] -= 1
+                        counts['failed'] += 1
     
-    return success_count, failed_count, skipped_count
+    return counts['success'], counts['failed'], counts['skipped'], phase2_done
 
 def cleanup_folders(ini_folder, temp_folder):
     """
@@ -420,23 +1134,33 @@ def cleanup_folders(ini_folder, temp_folder):
     """
     print_section("CLEANUP")
     
+    remove_folder(ini_folder, "INI folder")
+    remove_folder(temp_folder, "Temp folder")
+
+def clear_readonly_and_retry(func, path, exc):
+    """
+    rmtree error handler: clear the read-only flag that blocks deletes
+    on Windows and retry; any other error is re-raised
+    exc is an exception (onexc) or an exc_info tuple (onerror)
+    """
+    error = exc[1] if isinstance(exc, tuple) else exc
+    if not isinstance(error, PermissionError):
+        raise error
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+def remove_folder(folder, label):
+    """Delete a folder tree, reporting (not raising) a missing folder or other errors"""
     try:
-        # Delete INI folder
-        if os.path.exists(ini_folder):
-            shutil.rmtree(ini_folder)
-            print(f"✓ Deleted INI folder: {ini_folder}")
+        if sys.version_info >= (3, 12):
+            shutil.rmtree(folder, onexc=clear_readonly_and_retry)
         else:
-            print(f"⊘ INI folder not found (already deleted?): {ini_folder}")
-        
-        # Delete temp folder
-        if os.path.exists(temp_folder):
-            shutil.rmtree(temp_folder)
-            print(f"✓ Deleted temp folder: {temp_folder}")
-        else:
-            print(f"⊘ Temp folder not found (already deleted?): {temp_folder}")
-            
+            shutil.rmtree(folder, onerror=clear_readonly_and_retry)
+        print(f"✓ Deleted {label}: {folder}")
+    except FileNotFoundError:
+        print(f"⊘ {label} not found (already deleted?): {folder}")
     except Exception as e:
-        print(f"⚠ Error during cleanup: {e}")
+        print(f"⚠ Error deleting {label}: {e}")
 
 def generate_folder_name(start_datetime, end_datetime):
     """Generate folder name from datetime strings"""
@@ -457,6 +1181,9 @@ def parse_arguments():
         epilog='''
 Example:
   python upload_to_drive.py --start "10/18/2025 00:00:00" --end "10/18/2025 23:59:59"
+  
+  Upload alongside Phase 2 (start this before or while Phase 2 runs):
+    python upload_to_drive.py --start "10/18/2025 00:00:00" --end "10/18/2025 23:59:59" --watch
         '''
     )
     
@@ -464,6 +1191,8 @@ Example:
                        help='Start datetime in format "MM/DD/YYYY HH:MM:SS"')
     parser.add_argument('--end', required=True,
                        help='End datetime in format "MM/DD/YYYY HH:MM:SS"')
+    parser.add_argument('--watch', action='store_true',
+                       help='Upload files while Phase 2 is still downloading them')
     
     return parser.parse_args()
 
@@ -472,6 +1201,7 @@ def main():
     args = parse_arguments()
     start_datetime = args.start
     end_datetime = args.end
+    watch_mode = args.watch
     
     print_header("GOOGLE DRIVE UPLOADER (OAuth)")
     print(f"Start datetime: {start_datetime}")
@@ -485,7 +1215,8 @@ def main():
     temp_folder = os.path.join(TEMP_BASE_PATH, folder_name)
     ini_folder = os.path.join(INI_BASE_PATH, f"inis_{folder_name.replace('ads_', '')}")
     
-    if not os.path.exists(temp_folder):
+    # In watch mode Phase 2 may not have created the temp folder yet
+    if not watch_mode and not os.path.exists(temp_folder):
         print(f"\n✗ Temp folder not found: {temp_folder}")
         print("Make sure Phase 2 completed successfully.")
         return 1
@@ -495,21 +1226,24 @@ def main():
     
     # Authenticate
     print_section("AUTHENTICATING")
-    service = authenticate_drive()
+    creds = authenticate_drive()
     
-    if not service:
+    if not creds:
         print("\n✗ Failed to authenticate with Google Drive")
         return 1
     
-    # Clean temp folder (delete non-PCM files, rename PCM files)
-    files_ready = cleanup_temp_folder(temp_folder)
+    service = get_drive_service(creds)
     
-    if files_ready == 0:
-        print("\n⚠ No files ready for upload after cleanup")
-        return 1
+    if not watch_mode:
+        # Scan temp folder; PCM files are renamed as they are handed to the uploader
+        files_ready, wav_files = cleanup_temp_folder(temp_folder)
+        
+        if files_ready == 0:
+            print("\n⚠ No files ready for upload after cleanup")
+            return 1
     
     # Ensure folder structure exists in Drive
-    date_folder_id = ensure_folder_structure(service, folder_name)
+    date_folder_id, folder_is_new = ensure_folder_structure(service, folder_name)
     
     if not date_folder_id:
         print("\n✗ Failed to create/find folder structure in Drive")
@@ -518,9 +1252,15 @@ def main():
     print(f"\n✓ Drive folder ready: {MAIN_FOLDER_NAME}/{folder_name}")
     
     # Upload files
-    success_count, failed_count, skipped_count = upload_folder_contents(
-        service, temp_folder, date_folder_id
-    )
+    phase2_finished = True
+    if watch_mode:
+        success_count, failed_count, skipped_count, phase2_finished = watch_and_upload(
+            creds, temp_folder, date_folder_id, folder_is_new
+        )
+    else:
+        success_count, failed_count, skipped_count = upload_folder_contents(
+            creds, wav_files, files_ready, date_folder_id, folder_is_new
+        )
     
     # Summary
     print_section("UPLOAD SUMMARY")
@@ -530,6 +1270,13 @@ def main():
     print(f"Skipped (existing):    {skipped_count}")
     print(f"Failed:                {failed_count}")
     
+    # Phase 2 may still be writing into the temp folder
+    if not phase2_finished:
+        print("\n⚠ Phase 2 did not finish while watching")
+        print(f"Temp folder preserved for a batch-mode run: {temp_folder}")
+        print(f"INI folder preserved: {ini_folder}")
+        return 1
+    
     # Cleanup folders if upload was successful
     if failed_count == 0 and total_files > 0:
         cleanup_folders(ini_folder, temp_folder)
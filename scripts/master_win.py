@@ -1,8 +1,8 @@
-import subprocess
 import sys
 import os
 import argparse
 import json
+import importlib.util
 from datetime import datetime
 from pathlib import Path
 
@@ -15,8 +15,8 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
 # Script paths
-FETCH_METADATA_SCRIPT = os.path.join(SCRIPT_DIR, "fetch_metadata.py")
-GET_CREATIVES_SCRIPT = os.path.join(SCRIPT_DIR, "get_creatives.py")
+FETCH_METADATA_SCRIPT = os.path.join(SCRIPT_DIR, "1-fetch_metadata.py")
+GET_CREATIVES_SCRIPT = os.path.join(SCRIPT_DIR, "2-get_creatives.py")
 
 # Folder paths
 CREATIVES_METADATA_FOLDER = os.path.join(PROJECT_ROOT, "creatives_metadata")
@@ -50,26 +50,39 @@ def generate_json_filename(start_datetime, end_datetime):
     filename = f"ads_{start_formatted}_{end_formatted}.json"
     return os.path.join(CREATIVES_METADATA_FOLDER, filename)
 
-def run_script_with_live_output(script_path, args):
+def run_script_in_process(script_path, args):
     """
-    Run a Python script with live output streaming
+    Run a pipeline script's main(argv) in this process, without starting
+    a new interpreter; its output goes straight to this console
+    Runs from PROJECT_ROOT, so Phase 1's relative creatives_metadata folder
+    is the CREATIVES_METADATA_FOLDER this pipeline reads the JSON from
+    A main() that returns None counts as success, like a normal script exit
     Returns (exit_code, success)
     """
+    previous_cwd = os.getcwd()
     try:
-        cmd = [sys.executable, script_path] + args
+        os.chdir(PROJECT_ROOT)
         
-        # Run with live output (stdout/stderr inherited from parent)
-        result = subprocess.run(
-            cmd,
-            cwd=SCRIPT_DIR,
-            text=True
-        )
+        module_name = os.path.splitext(os.path.basename(script_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
         
-        return result.returncode, result.returncode == 0
+        exit_code = module.main(args)
         
+    except SystemExit as e:
+        # argparse errors and explicit exit() calls inside the script
+        exit_code = e.code if isinstance(e.code, int) or e.code is None else 1
     except Exception as e:
         print(f"✗ Error running script: {e}")
         return 1, False
+    finally:
+        os.chdir(previous_cwd)
+    
+    if exit_code is None:
+        exit_code = 0
+    
+    return exit_code, exit_code == 0
 
 def check_json_exists(json_path):
     """Check if JSON file exists and return its data"""
@@ -142,7 +155,7 @@ def main():
     print_section("PHASE 1: FETCHING METADATA")
     
     fetch_args = ["--start", start_datetime, "--end", end_datetime]
-    exit_code, success = run_script_with_live_output(FETCH_METADATA_SCRIPT, fetch_args)
+    exit_code, success = run_script_in_process(FETCH_METADATA_SCRIPT, fetch_args)
     
     if not success:
         print(f"\n✗ Phase 1 failed with exit code {exit_code}")
@@ -182,7 +195,7 @@ def main():
     print_section("PHASE 2: DOWNLOADING CREATIVES")
     
     get_creatives_args = ["--json", expected_json]
-    exit_code, success = run_script_with_live_output(GET_CREATIVES_SCRIPT, get_creatives_args)
+    exit_code, success = run_script_in_process(GET_CREATIVES_SCRIPT, get_creatives_args)
     
     if not success:
         print(f"\n✗ Phase 2 failed with exit code {exit_code}")